@@ -9,16 +9,18 @@ Usage:
 
 import argparse
 import logging
+import os
 import signal
 import sys
 import threading
 
-import uvicorn
+import cv2
 
 from routeball.capture import GlassCapture
 from routeball.config import AppConfig, CaptureConfig, StorageConfig, StreamConfig
-from routeball.storage import VideoStorage
-from routeball.stream import app, set_frame_source
+
+# uvicorn, routeball.stream (FastAPI), and routeball.storage are imported
+# lazily in main() so that --no-stream / --no-save skip their import cost.
 
 logging.basicConfig(
     level=logging.INFO,
@@ -48,6 +50,12 @@ def parse_args() -> argparse.Namespace:
 def main():
     args = parse_args()
 
+    # Cap OpenCV's internal pool (imencode, cvtColor, VideoWriter all use
+    # it and default to every core). The capture pump, storage writer,
+    # stream encoder, and uvicorn threads need the rest; letting OpenCV
+    # oversubscribe them shows up as frame-cadence jitter.
+    cv2.setNumThreads(max(1, (os.cpu_count() or 2) // 2))
+
     config = AppConfig(
         capture=CaptureConfig(
             mode=args.mode,
@@ -69,6 +77,8 @@ def main():
     # Initialize storage
     storage = None
     if config.save_locally:
+        from routeball.storage import VideoStorage
+
         storage = VideoStorage(config.storage)
 
     # Graceful shutdown
@@ -95,7 +105,11 @@ def main():
 
     # Start streaming server in background thread
     if config.enable_streaming:
-        set_frame_source(capture)
+        import uvicorn
+
+        from routeball.stream import app, set_frame_source
+
+        set_frame_source(capture, config.stream)
         server_thread = threading.Thread(
             target=uvicorn.run,
             args=(app,),
@@ -105,10 +119,9 @@ def main():
         server_thread.start()
         logger.info("Streaming at http://0.0.0.0:%d/stream", config.stream.port)
 
-    # Frame callback
-    def on_frame(frame):
-        if storage:
-            storage.write_frame(frame)
+    # Frame callback (only when recording, so the capture can skip
+    # decoding frames that no one consumes)
+    on_frame = storage.write_frame if storage else None
 
     logger.info("Recording started. Press Ctrl+C to stop.")
     capture.run_loop(on_frame=on_frame)
@@ -6,8 +6,11 @@ Supports two capture modes:
 """
 
 import logging
+import os
+import queue
 import subprocess
 import threading
+import time
 from typing import Callable
 
 import cv2
@@ -17,19 +20,125 @@ from .config import CaptureConfig
 
 logger = logging.getLogger(__name__)
 
+try:
+    from numba import njit, prange
+
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _yuv420_to_bgr_jit(y, u, v, out):  # pragma: no cover - compiled
+        h, w = y.shape
+        for i in prange(h):
+            ci = i // 2
+            for j in range(w):
+                cj = j // 2
+                yy = 1.164 * (y[i, j] - 16.0)
+                uu = u[ci, cj] - 128.0
+                vv = v[ci, cj] - 128.0
+                b = yy + 2.018 * uu
+                g = yy - 0.391 * uu - 0.813 * vv
+                r = yy + 1.596 * vv
+                out[i, j, 0] = min(255.0, max(0.0, b))
+                out[i, j, 1] = min(255.0, max(0.0, g))
+                out[i, j, 2] = min(255.0, max(0.0, r))
+
+except ImportError:
+    _yuv420_to_bgr_jit = None
+
+
+def _make_yuv_converter(
+    width: int, height: int
+) -> Callable[[np.ndarray, np.ndarray], None]:
+    """Build a YUV420-to-BGR converter specialized for a fixed frame size.
+
+    The frame geometry is fixed at startup, so the plane offsets and
+    shapes are bound into the closure once instead of being recomputed
+    from config attributes on every frame. Uses the Numba-vectorized
+    BT.601 kernel when numba is installed (the first call pays a one-off
+    JIT compile, cached on disk afterwards); otherwise falls back to
+    OpenCV's generic cvtColor path.
+    """
+    y_end = width * height
+    u_end = y_end + y_end // 4
+    half = (height // 2, width // 2)
+
+    if _yuv420_to_bgr_jit is None:
+        def convert(yuv: np.ndarray, dst: np.ndarray) -> None:
+            cv2.cvtColor(yuv, cv2.COLOR_YUV2BGR_I420, dst=dst)
+    else:
+        def convert(yuv: np.ndarray, dst: np.ndarray) -> None:
+            flat = yuv.reshape(-1)
+            _yuv420_to_bgr_jit(
+                flat[:y_end].reshape(height, width),
+                flat[y_end:u_end].reshape(half),
+                flat[u_end:].reshape(half),
+                dst,
+            )
+
+    return convert
+
 
 class GlassCapture:
     """Captures video frames from Android-based smart glasses."""
 
+    # Number of frame buffers in the reuse ring. Three slots are enough to
+    # let readers hold the latest frame while the next two are written.
+    POOL_SIZE = 3
+
+    # Serials whose `adb devices` check already passed in this process.
+    # Each check costs a fork/exec plus an adb-server round trip (~100 ms),
+    # so restarts skip it; a vanished device still fails fast when the
+    # screenrecord pipeline itself dies.
+    _verified_devices: set[str | None] = set()
+
     def __init__(self, config: CaptureConfig):
         self.config = config
         self._cap: cv2.VideoCapture | None = None
+        self._adb_proc: subprocess.Popen | None = None
+        self._ffmpeg_proc: subprocess.Popen | None = None
+        self._frame_bytes = 0
         self._running = False
-        self._lock = threading.Lock()
-        self._latest_frame: np.ndarray | None = None
+        # Ring of pre-allocated frame buffers. Frames are written round-robin
+        # and published by index; an int assignment is atomic in CPython, so
+        # readers never see a half-updated pointer.
+        self._pool: list[np.ndarray] = []
+        self._write_idx = 0
+        self._latest_idx = -1
+        # ADB mode keeps a separate ring of raw YUV420p buffers; the pipe
+        # carries half the bytes of BGR24 and the BGR conversion is done
+        # lazily, only when a consumer actually wants the frame.
+        self._yuv_pool: list[np.ndarray] = []
+        self._yuv_idx = 0
+        # Size-specialized converter bound at start(); see _make_yuv_converter
+        self._convert_yuv: Callable[[np.ndarray, np.ndarray], None] | None = None
+        # Number of connected MJPEG viewers; when zero and no recording
+        # callback is active, frames are grabbed but not decoded. Updated
+        # from concurrent server threads, so guarded by a lock.
+        self._stream_subscribers = 0
+        self._subscriber_lock = threading.Lock()
+        # Set each time a new frame is published, so consumers can block
+        # on frame arrival instead of polling.
+        self._frame_event = threading.Event()
+        # Depth-1 fan-out queues, one per subscribed consumer. The pump
+        # drops the oldest frame rather than ever blocking on a consumer.
+        self._consumers: list[queue.Queue] = []
+        self._pump_thread: threading.Thread | None = None
 
     def start(self) -> None:
         """Open the video capture source."""
+        self._pool = [
+            np.empty((self.config.height, self.config.width, 3), np.uint8)
+            for _ in range(self.POOL_SIZE)
+        ]
+        self._yuv_pool = [
+            np.empty((self.config.height * 3 // 2, self.config.width), np.uint8)
+            for _ in range(self.POOL_SIZE)
+        ]
+        self._write_idx = 0
+        self._latest_idx = -1
+        self._yuv_idx = 0
+        self._convert_yuv = _make_yuv_converter(
+            self.config.width, self.config.height
+        )
+
         if self.config.mode == "rtsp":
             self._start_rtsp()
         elif self.config.mode == "adb":
@@ -42,6 +151,14 @@ class GlassCapture:
 
     def _start_rtsp(self) -> None:
         """Connect to the glasses via RTSP stream."""
+        # Tell OpenCV's ffmpeg backend not to probe/buffer the stream:
+        # the defaults (5 MB probesize, 5 s analyzeduration, frame
+        # reordering buffer) add seconds of startup and a frame of latency.
+        os.environ.setdefault(
+            "OPENCV_FFMPEG_CAPTURE_OPTIONS",
+            "fflags;nobuffer|flags;low_delay|probesize;32"
+            "|analyzeduration;0|rtsp_transport;tcp",
+        )
         self._cap = cv2.VideoCapture(self.config.rtsp_url)
         if not self._cap.isOpened():
             raise ConnectionError(
@@ -51,25 +168,29 @@ class GlassCapture:
     def _start_adb(self) -> None:
         """Connect to the glasses via ADB screencast.
 
-        Uses `adb exec-out screenrecord --output-format=h264 -` to pipe
-        raw H.264 frames from the device into an ffmpeg-backed OpenCV reader.
+        Spawns `adb exec-out screenrecord --output-format=h264 -` and pipes
+        its H.264 output into an ffmpeg process that decodes to raw YUV420p
+        frames on stdout. Reading raw frames directly avoids OpenCV's
+        internal stream probing and buffering on the capture path, and
+        staying in YUV keeps pipe traffic at half the BGR24 volume.
         """
         serial_args = []
         if self.config.adb_serial:
             serial_args = ["-s", self.config.adb_serial]
 
-        # Verify device is connected
-        result = subprocess.run(
-            ["adb", *serial_args, "devices"],
-            capture_output=True,
-            text=True,
-        )
-        if "device" not in result.stdout.split("\n", 1)[-1]:
-            raise ConnectionError(
-                "No ADB device found. Connect glasses via USB or WiFi ADB."
+        # Verify device is connected (once per process; see _verified_devices)
+        if self.config.adb_serial not in self._verified_devices:
+            result = subprocess.run(
+                ["adb", *serial_args, "devices"],
+                capture_output=True,
+                text=True,
             )
+            if "device" not in result.stdout.split("\n", 1)[-1]:
+                raise ConnectionError(
+                    "No ADB device found. Connect glasses via USB or WiFi ADB."
+                )
+            self._verified_devices.add(self.config.adb_serial)
 
-        # Build the ADB screenrecord pipeline
         adb_cmd = [
             "adb",
             *serial_args,
@@ -79,55 +200,244 @@ class GlassCapture:
             f"--size={self.config.width}x{self.config.height}",
             "-",
         ]
+        ffmpeg_cmd = [
+            "ffmpeg",
+            "-loglevel", "error",
+            # Low-latency demux/decode: no probing, no reorder buffering.
+            "-fflags", "nobuffer",
+            "-flags", "low_delay",
+            "-probesize", "32",
+            "-analyzeduration", "0",
+            "-f", "h264",
+            "-i", "pipe:0",
+            "-f", "rawvideo",
+            "-pix_fmt", "yuv420p",
+            "-s", f"{self.config.width}x{self.config.height}",
+            "pipe:1",
+        ]
 
-        # OpenCV can read from an ffmpeg pipe fed by ADB
-        pipeline = (
-            f"{' '.join(adb_cmd)} | "
-            f"ffmpeg -i pipe:0 -f rawvideo -pix_fmt bgr24 "
-            f"-s {self.config.width}x{self.config.height} pipe:1"
-        )
-        self._cap = cv2.VideoCapture(pipeline, cv2.CAP_FFMPEG)
+        try:
+            self._adb_proc = subprocess.Popen(adb_cmd, stdout=subprocess.PIPE)
+            self._ffmpeg_proc = subprocess.Popen(
+                ffmpeg_cmd,
+                stdin=self._adb_proc.stdout,
+                stdout=subprocess.PIPE,
+            )
+        except FileNotFoundError as e:
+            self._stop_adb_procs()
+            raise ConnectionError(f"Failed to open ADB capture pipeline: {e}")
 
-        if not self._cap.isOpened():
-            raise ConnectionError("Failed to open ADB capture pipeline.")
+        # Let the parent drop its reference so ffmpeg sees EOF if adb dies
+        self._adb_proc.stdout.close()
+        # YUV420p: 1.5 bytes per pixel, half the pipe traffic of BGR24
+        self._frame_bytes = self.config.width * self.config.height * 3 // 2
+
+    def _stop_adb_procs(self) -> None:
+        """Terminate the ADB and ffmpeg subprocesses if running."""
+        for proc in (self._ffmpeg_proc, self._adb_proc):
+            if proc is not None and proc.poll() is None:
+                proc.terminate()
+                try:
+                    proc.wait(timeout=2)
+                except subprocess.TimeoutExpired:
+                    proc.kill()
+        self._adb_proc = None
+        self._ffmpeg_proc = None
+
+    def _read_adb_frame(self, dst: np.ndarray) -> bool:
+        """Read one raw YUV420p frame from the ffmpeg pipe into `dst`."""
+        # Local reference: stop() nulls the handle from another thread.
+        proc = self._ffmpeg_proc
+        if proc is None:
+            return False
+        view = memoryview(dst.reshape(-1))
+        read = 0
+        while read < self._frame_bytes:
+            n = proc.stdout.readinto(view[read:])
+            if not n:
+                return False
+            read += n
+        return True
 
-    def read_frame(self) -> np.ndarray | None:
+    def read_frame(self, decode: bool = True) -> np.ndarray | None:
         """Read a single frame from the capture source.
 
-        Returns None if no frame is available.
+        Args:
+            decode: Whether the caller itself consumes the frame. When False
+                and no MJPEG viewer is connected, the source is advanced but
+                the decode (RTSP) or YUV-to-BGR conversion (ADB) is skipped.
+
+        Returns None if no frame is available (or its decode was skipped).
         """
-        if self._cap is None or not self._running:
+        if not self._running:
             return None
+        skip = not decode and self._stream_subscribers == 0
+        if self._ffmpeg_proc is not None:
+            return self._read_adb(skip)
+        if self._cap is not None:
+            return self._read_opencv(skip)
+        return None
 
-        ret, frame = self._cap.read()
+    def _read_adb(self, skip: bool) -> np.ndarray | None:
+        """Drain one YUV frame from the pipe; convert to BGR if consumed."""
+        yuv = self._yuv_pool[self._yuv_idx]
+        if not self._read_adb_frame(yuv):
+            logger.warning("Failed to read frame")
+            return None
+        self._yuv_idx = (self._yuv_idx + 1) % len(self._yuv_pool)
+
+        if skip:
+            # The pipe is drained either way; only the colorspace
+            # conversion is skippable, and nobody wants the pixels.
+            return None
+
+        buf = self._pool[self._write_idx]
+        self._convert_yuv(yuv, buf)
+        return self._publish(buf)
+
+    def _read_opencv(self, skip: bool) -> np.ndarray | None:
+        """Grab a frame from cv2.VideoCapture; retrieve only if consumed."""
+        if skip:
+            # Advance the stream pointer without paying for the decode.
+            self._cap.grab()
+            return None
+
+        if not self._cap.grab():
+            logger.warning("Failed to read frame")
+            return None
+        buf = self._pool[self._write_idx]
+        ret, frame = self._cap.retrieve(buf)
         if not ret:
             logger.warning("Failed to read frame")
             return None
+        if frame is not buf:
+            # OpenCV fell back to its own allocation (e.g. the stream
+            # resolution differs from the config); adopt it as the slot.
+            self._pool[self._write_idx] = buf = frame
+        return self._publish(buf)
 
-        with self._lock:
-            self._latest_frame = frame
-        return frame
+    def _publish(self, buf: np.ndarray) -> np.ndarray:
+        """Publish `buf` as the latest frame and wake waiting consumers."""
+        self._latest_idx = self._write_idx
+        self._write_idx = (self._write_idx + 1) % len(self._pool)
+        self._frame_event.set()
+        return buf
 
     @property
     def latest_frame(self) -> np.ndarray | None:
-        """Return the most recently captured frame (thread-safe)."""
-        with self._lock:
-            return self._latest_frame.copy() if self._latest_frame is not None else None
+        """Return the most recently captured frame without copying.
+
+        The returned array is a slot in the internal buffer ring and will be
+        overwritten a few frames later; consumers that need the pixels beyond
+        the next couple of frames (e.g. JPEG encoding) should use them
+        immediately or copy.
+        """
+        if self._latest_idx < 0:
+            return None
+        return self._pool[self._latest_idx]
+
+    def wait_for_frame(self, timeout: float | None = None) -> bool:
+        """Block until a new frame has been captured.
+
+        Returns True if a frame arrived within the timeout, False otherwise.
+        """
+        if not self._frame_event.wait(timeout):
+            return False
+        self._frame_event.clear()
+        return True
+
+    def add_stream_subscriber(self) -> None:
+        """Register a connected MJPEG viewer (enables frame decoding)."""
+        with self._subscriber_lock:
+            self._stream_subscribers += 1
+
+    def remove_stream_subscriber(self) -> None:
+        """Unregister a disconnected MJPEG viewer."""
+        with self._subscriber_lock:
+            self._stream_subscribers = max(0, self._stream_subscribers - 1)
+
+    def subscribe(self) -> queue.Queue:
+        """Register a frame consumer.
+
+        Returns a depth-1 queue that always holds the newest frame; older
+        undelivered frames are dropped so a slow consumer can never stall
+        the capture.
+        """
+        q = queue.Queue(maxsize=1)
+        self._consumers.append(q)
+        return q
+
+    def _pump(self) -> None:
+        """Read frames and fan them out to subscriber queues."""
+        # Hoisted out of the per-frame loop; fixed for the pump's lifetime
+        read_frame = self.read_frame
+        consumers = self._consumers
+        while self._running:
+            frame = read_frame(decode=bool(consumers))
+            if frame is None:
+                continue
+            for q in consumers:
+                try:
+                    q.put_nowait(frame)
+                except queue.Full:
+                    # Drop the stale frame and retry with the new one.
+                    try:
+                        q.get_nowait()
+                    except queue.Empty:
+                        pass
+                    try:
+                        q.put_nowait(frame)
+                    except queue.Full:
+                        pass
 
     def run_loop(self, on_frame: Callable[[np.ndarray], None] | None = None) -> None:
-        """Continuously capture frames until stopped.
+        """Run the capture pump until stopped.
+
+        Frames are read on a dedicated daemon thread and handed to
+        consumers through depth-1 queues, so the reader never contends
+        with consumers for the GIL mid-frame.
 
         Args:
             on_frame: Optional callback invoked with each captured frame.
+                It runs on the calling thread, fed by a subscription queue.
+                When omitted, frames are only decoded while MJPEG viewers
+                are connected.
         """
+        self._pump_thread = threading.Thread(target=self._pump, daemon=True)
+        self._pump_thread.start()
+
+        if on_frame is None:
+            while self._running:
+                time.sleep(0.5)
+            return
+
+        q = self.subscribe()
         while self._running:
-            frame = self.read_frame()
-            if frame is not None and on_frame:
-                on_frame(frame)
+            try:
+                frame = q.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            on_frame(frame)
 
     def stop(self) -> None:
         """Release the capture source."""
         self._running = False
+        # Terminate the pipe producers first so a pump thread blocked in
+        # a read sees EOF and can exit; only once the pump is joined is
+        # it safe to release the capture handles it may be using.
+        for proc in (self._ffmpeg_proc, self._adb_proc):
+            if proc is not None and proc.poll() is None:
+                proc.terminate()
+        if self._pump_thread is not None and self._pump_thread.is_alive():
+            self._pump_thread.join(timeout=2)
+            if self._pump_thread.is_alive():
+                # Daemon thread still stuck in a read; leave the source
+                # handles alone rather than release them under its feet.
+                logger.warning("Capture pump did not exit; leaving source open")
+                self._pump_thread = None
+                return
+        self._pump_thread = None
+        self._stop_adb_procs()
         if self._cap is not None:
             self._cap.release()
             self._cap = None
@@ -30,7 +30,8 @@ class StorageConfig:
     filename_prefix: str = "routeball"
     # Max file size in MB before rotating (0 = no limit)
     max_file_size_mb: int = 500
-    codec: str = "mp4v"
+    # FourCC codec, or "auto" to prefer H.264 and fall back to mp4v
+    codec: str = "auto"
     container: str = ".mp4"
 
 
@@ -42,6 +43,10 @@ class StreamConfig:
     port: int = 8000
     # MJPEG stream quality (1-100)
     jpeg_quality: int = 80
+    # Integer downscale factor for the live stream (1 = full resolution).
+    # Viewers watch in small browser tabs; a 2x downscale cuts JPEG CPU
+    # and bandwidth by ~4x.
+    stream_scale: int = 2
 
 
 @dataclass
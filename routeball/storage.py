@@ -1,6 +1,8 @@
 """Local video storage with automatic file rotation."""
 
 import logging
+import queue
+import threading
 from datetime import datetime
 from pathlib import Path
 
@@ -15,18 +17,42 @@ logger = logging.getLogger(__name__)
 class VideoStorage:
     """Saves captured frames to local MP4 files with optional rotation."""
 
+    # Bounded write queue: enough slack to ride out disk I/O hiccups
+    # (~2 s at 30 fps) without unbounded memory growth.
+    QUEUE_DEPTH = 64
+
+    # Probe order for codec="auto": H.264 variants give ~5x smaller files
+    # than MPEG-4 Part 2 at equal quality (and use hardware encoders in
+    # OpenCV builds that have them); mp4v works everywhere as a fallback.
+    CODEC_CANDIDATES = ("avc1", "h264", "mp4v")
+
     def __init__(self, config: StorageConfig):
         self.config = config
         self._writer: cv2.VideoWriter | None = None
         self._current_path: Path | None = None
         self._frame_count = 0
         self._fps = 30
+        self._q: queue.Queue | None = None
+        self._thread: threading.Thread | None = None
+        self._dropped = 0
+        self._approx_bytes = 0
+        # Codec that actually opened; cached so rotation doesn't re-probe
+        self._codec: str | None = None
 
     def open(self, width: int, height: int, fps: int = 30) -> Path:
-        """Start a new recording file.
+        """Start a new recording file and the background writer thread.
 
         Returns the path to the new file.
         """
+        path = self._open_writer(width, height, fps)
+        if self._thread is None:
+            self._q = queue.Queue(maxsize=self.QUEUE_DEPTH)
+            self._thread = threading.Thread(target=self._writer_loop, daemon=True)
+            self._thread.start()
+        return path
+
+    def _open_writer(self, width: int, height: int, fps: int) -> Path:
+        """Create the VideoWriter for a new timestamped file."""
         self._fps = fps
         self.config.output_dir.mkdir(parents=True, exist_ok=True)
 
@@ -34,46 +60,106 @@ class VideoStorage:
         filename = f"{self.config.filename_prefix}_{timestamp}{self.config.container}"
         self._current_path = self.config.output_dir / filename
 
-        fourcc = cv2.VideoWriter_fourcc(*self.config.codec)
-        self._writer = cv2.VideoWriter(
-            str(self._current_path), fourcc, fps, (width, height)
-        )
+        if self._codec is not None:
+            candidates = (self._codec,)
+        elif self.config.codec == "auto":
+            candidates = self.CODEC_CANDIDATES
+        else:
+            candidates = (self.config.codec,)
+
+        for codec in candidates:
+            fourcc = cv2.VideoWriter_fourcc(*codec)
+            self._writer = cv2.VideoWriter(
+                str(self._current_path), fourcc, fps, (width, height)
+            )
+            if self._writer.isOpened():
+                if self._codec is None:
+                    logger.info("Using video codec %s", codec)
+                self._codec = codec
+                break
+            self._writer.release()
+            self._writer = None
 
-        if not self._writer.isOpened():
+        if self._writer is None:
             raise IOError(f"Failed to open video writer: {self._current_path}")
 
         self._frame_count = 0
+        self._approx_bytes = 0
         logger.info("Recording to %s", self._current_path)
         return self._current_path
 
     def write_frame(self, frame: np.ndarray) -> None:
-        """Write a single frame to the current recording file.
+        """Queue a single frame for the writer thread.
 
-        Automatically rotates to a new file if max size is exceeded.
+        Never blocks: if the disk cannot keep up and the queue fills,
+        the frame is dropped so capture stays real-time.
         """
-        if self._writer is None:
+        if self._q is None:
             raise RuntimeError("Storage not opened. Call open() first.")
 
-        self._writer.write(frame)
-        self._frame_count += 1
-
-        if self._should_rotate():
-            h, w = frame.shape[:2]
-            self.close()
-            self.open(w, h, self._fps)
+        try:
+            # Copy: the capture hands out slots from its buffer ring,
+            # which are overwritten a few frames later.
+            self._q.put_nowait(frame.copy())
+        except queue.Full:
+            self._dropped += 1
+            if self._dropped == 1 or self._dropped % 100 == 0:
+                logger.warning(
+                    "Write queue full; %d frames dropped so far", self._dropped
+                )
+
+    def _writer_loop(self) -> None:
+        """Drain queued frames to disk, rotating files as needed."""
+        while True:
+            frame = self._q.get()
+            if frame is None:  # sentinel from close()
+                break
+            if self._writer is None:
+                continue
+
+            self._writer.write(frame)
+            self._frame_count += 1
+            # Conservative compressed-size estimate (~20:1); avoids a
+            # stat() syscall per frame just to check the rotation limit.
+            self._approx_bytes += frame.nbytes // 20
+
+            if self._should_rotate():
+                h, w = frame.shape[:2]
+                self._close_writer()
+                self._open_writer(w, h, self._fps)
 
     def _should_rotate(self) -> bool:
-        """Check if the current file exceeds the max size limit."""
+        """Check if the current file exceeds the max size limit.
+
+        Uses the in-process byte estimate and only confirms with a real
+        stat() once the estimate crosses the threshold.
+        """
         if self.config.max_file_size_mb <= 0 or self._current_path is None:
             return False
+        limit = self.config.max_file_size_mb * 1024 * 1024
+        if self._approx_bytes < limit:
+            return False
         try:
-            size_mb = self._current_path.stat().st_size / (1024 * 1024)
-            return size_mb >= self.config.max_file_size_mb
+            actual = self._current_path.stat().st_size
         except FileNotFoundError:
             return False
+        if actual < limit:
+            # The estimate ran ahead of the real file; resync and keep going.
+            self._approx_bytes = actual
+            return False
+        return True
 
     def close(self) -> None:
-        """Finalize and close the current recording file."""
+        """Flush pending frames and close the current recording file."""
+        if self._thread is not None:
+            self._q.put(None)
+            self._thread.join(timeout=10)
+            self._thread = None
+            self._q = None
+        self._close_writer()
+
+    def _close_writer(self) -> None:
+        """Finalize and release the current VideoWriter."""
         if self._writer is not None:
             self._writer.release()
             self._writer = None
@@ -1,8 +1,11 @@
 """Live MJPEG streaming server using FastAPI."""
 
 import logging
+import threading
+import time
 
 import cv2
+import numpy as np
 from fastapi import FastAPI
 from fastapi.responses import StreamingResponse
 
@@ -10,38 +13,165 @@ from .config import StreamConfig
 
 logger = logging.getLogger(__name__)
 
+try:
+    from turbojpeg import TJPF_BGR, TurboJPEG
+
+    _turbojpeg: "TurboJPEG | None" = TurboJPEG()
+except (ImportError, OSError):
+    # PyTurboJPEG or the native libjpeg-turbo is not installed; fall back
+    # to OpenCV's (slower, unaccelerated) JPEG encoder.
+    _turbojpeg = None
+
 app = FastAPI(title="routeBall Stream")
 
-# Global reference set by main.py before starting the server
+# Globals set by main.py before starting the server
 _frame_source = None
+_stream_config: StreamConfig | None = None
+
+# Shared latest-frame slot, filled by a single background encoder thread so
+# the JPEG cost stays constant no matter how many viewers are connected.
+# The slot holds a fully assembled, immutable multipart part (headers +
+# JPEG body), so every viewer yields the same bytes object with no
+# per-viewer copying. Viewers wait on the condition and are woken once
+# per published frame.
+_jpeg_cond = threading.Condition()
+_latest_part: bytes | None = None
+_jpeg_seq = 0
+
+# Backpressure feedback: viewers bump this when sending a frame took
+# longer than a frame interval; the encoder trades quality for cadence.
+_slow_reports = 0
+MIN_JPEG_QUALITY = 40
+_viewers = 0
+_encoder_thread: threading.Thread | None = None
+
+
+def set_frame_source(source, config: StreamConfig | None = None):
+    """Set the frame source (GlassCapture instance) and stream settings."""
+    global _frame_source, _stream_config
+    _frame_source = source
+    if config is not None:
+        _stream_config = config
 
 
-def set_frame_source(source):
-    """Set the frame source (GlassCapture instance) for the stream."""
-    global _frame_source
-    _frame_source = source
+def _start_encoder() -> None:
+    """Start the shared JPEG encoder thread (idempotent)."""
+    global _encoder_thread
+    if _encoder_thread is None or not _encoder_thread.is_alive():
+        _encoder_thread = threading.Thread(target=_encoder_loop, daemon=True)
+        _encoder_thread.start()
 
 
-def _generate_mjpeg(quality: int):
-    """Yield MJPEG frames as a multipart HTTP response."""
+def _encoder_loop() -> None:
+    """Encode the latest captured frame once and publish it to all viewers."""
+    global _latest_part, _jpeg_seq, _slow_reports
+    config = _stream_config if _stream_config is not None else StreamConfig()
+    quality = config.jpeg_quality
+    scale = max(1, config.stream_scale)
+    part_buf = bytearray()
     while True:
-        if _frame_source is None:
+        if _frame_source is None or _viewers == 0:
+            time.sleep(0.1)
             continue
 
-        frame = _frame_source.latest_frame
-        if frame is None:
+        # Block until the capture publishes a new frame; no polling.
+        if not _frame_source.wait_for_frame(timeout=1.0):
             continue
 
-        ret, jpeg = cv2.imencode(
-            ".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, quality]
-        )
-        if not ret:
+        frame = _frame_source.latest_frame
+        if frame is None:
             continue
 
-        yield (
-            b"--frame\r\n"
-            b"Content-Type: image/jpeg\r\n\r\n" + jpeg.tobytes() + b"\r\n"
-        )
+        if scale > 1:
+            # JPEG cost scales with pixel count; encode at viewer size.
+            h, w = frame.shape[:2]
+            frame = cv2.resize(
+                frame, (w // scale, h // scale), interpolation=cv2.INTER_AREA
+            )
+
+        # Trade quality for cadence while viewers report slow sends;
+        # creep back toward the configured quality once they keep up.
+        with _jpeg_cond:
+            slow = _slow_reports
+            _slow_reports = 0
+        if slow:
+            quality = max(MIN_JPEG_QUALITY, quality - 5)
+        elif quality < config.jpeg_quality:
+            quality += 1
+
+        jpeg = _encode_jpeg(frame, quality)
+        if jpeg is not None:
+            # Assemble into the reusable scratch buffer (its allocation
+            # amortizes across frames), then publish an immutable bytes
+            # snapshot: viewers may still be sending an older part, so
+            # the shared slot must never be mutated after publication.
+            del part_buf[:]
+            part_buf += (
+                b"--frame\r\n"
+                b"Content-Type: image/jpeg\r\n"
+                b"Content-Length: "
+            )
+            part_buf += str(len(jpeg)).encode()
+            part_buf += b"\r\n\r\n"
+            part_buf += jpeg
+            part_buf += b"\r\n"
+            with _jpeg_cond:
+                _latest_part = bytes(part_buf)
+                _jpeg_seq += 1
+                _jpeg_cond.notify_all()
+
+
+def _encode_jpeg(frame: np.ndarray, quality: int) -> "bytes | memoryview | None":
+    """Encode a BGR frame to JPEG bytes (or a bytes-like view).
+
+    Uses libjpeg-turbo's SIMD encoder when available (2-5x faster than
+    OpenCV's default libjpeg path); returns None if encoding fails. The
+    OpenCV fallback returns a memoryview over the encoder's own output
+    array to avoid an extra copy.
+    """
+    if _turbojpeg is not None:
+        return _turbojpeg.encode(frame, quality=quality, pixel_format=TJPF_BGR)
+    ret, jpeg = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    return jpeg.reshape(-1).data if ret else None
+
+
+def _generate_mjpeg():
+    """Yield MJPEG frames as a multipart HTTP response.
+
+    Each viewer waits for the shared encoder thread to publish a new JPEG;
+    a sequence counter lets slow viewers skip straight to the latest frame.
+    Sends that take longer than a frame interval are reported back to the
+    encoder so it can lower JPEG quality under backpressure.
+    """
+    global _viewers, _slow_reports
+    if _frame_source is not None:
+        _frame_source.add_stream_subscriber()
+        frame_interval = 1.0 / max(1, _frame_source.config.fps)
+    else:
+        frame_interval = 1.0 / 30
+    with _jpeg_cond:
+        _viewers += 1
+    try:
+        last_seq = 0
+        while True:
+            with _jpeg_cond:
+                if not _jpeg_cond.wait_for(
+                    lambda: _jpeg_seq != last_seq, timeout=1.0
+                ):
+                    continue
+                part = _latest_part
+                last_seq = _jpeg_seq
+
+            sent_at = time.monotonic()
+            yield part
+            if time.monotonic() - sent_at > frame_interval:
+                with _jpeg_cond:
+                    _slow_reports += 1
+    finally:
+        with _jpeg_cond:
+            _viewers -= 1
+        if _frame_source is not None:
+            _frame_source.remove_stream_subscriber()
 
 
 @app.get("/")
@@ -59,8 +189,9 @@ def index():
 @app.get("/stream")
 def video_stream():
     """Live MJPEG stream from the glasses."""
+    _start_encoder()
     return StreamingResponse(
-        _generate_mjpeg(quality=80),
+        _generate_mjpeg(),
         media_type="multipart/x-mixed-replace; boundary=frame",
     )
 
@@ -71,16 +202,25 @@ def snapshot():
     if _frame_source is None:
         return {"error": "No capture source available"}
 
-    frame = _frame_source.latest_frame
+    # Register as a consumer and wait for the next frame: with no
+    # recorder and no stream viewers the capture skips decoding, so the
+    # published frame would otherwise be missing or arbitrarily stale.
+    _frame_source.add_stream_subscriber()
+    try:
+        _frame_source.wait_for_frame(timeout=1.0)
+        frame = _frame_source.latest_frame
+    finally:
+        _frame_source.remove_stream_subscriber()
+
     if frame is None:
         return {"error": "No frame available"}
 
-    ret, jpeg = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, 90])
-    if not ret:
+    jpeg = _encode_jpeg(frame, quality=90)
+    if jpeg is None:
         return {"error": "Failed to encode frame"}
 
     return StreamingResponse(
-        iter([jpeg.tobytes()]),
+        iter([bytes(jpeg)]),
         media_type="image/jpeg",
     )
 